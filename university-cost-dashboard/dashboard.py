@@ -1,9 +1,29 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import re
 import os  # keep this if you're using os.getenv() or path ops
 
+# Chart palettes, bound once instead of looked up on every chart build
+PIE_COLORS = px.colors.qualitative.Set3
+BAR_COLORS = px.colors.sequential.Blues_r
+CMP_COLORS = px.colors.qualitative.Set2
+
+# Cost columns converted to INR
+USD_COST_COLUMNS = ["Tuition_USD", "Rent_USD", "Visa_Fee_USD", "Insurance_USD"]
+# Low-cardinality text columns used as filter and groupby keys
+CATEGORY_COLUMNS = ["Country", "University", "Program", "Level"]
+# Column names checked for degree level information
+LEVEL_COLUMNS = ['Level', 'Degree', 'Degree_Level', 'Program_Level', 'Study_Level']
+# Degree levels recognised in Program names when no level column exists
+LEVEL_PATTERN = re.compile(r'(Bachelor|Master|PhD|Doctorate|Graduate|Undergraduate)', re.IGNORECASE)
+# Rows sent to the browser in the comparison table
+MAX_TABLE_ROWS = 500
+
 # ⛔️ Removed: os.chdir(...)
 
 # Page config
@@ -38,7 +58,15 @@ This dashboard provides a comprehensive comparative view of university expenses
 def load_data():
     """Load and cache the education cost dataset"""
     try:
-        df = pd.read_csv("international_education_costs.csv")
+        # Stored USD inputs are whole amounts, exact in float32; derived values use float64
+        dtypes = {col: "float32" for col in USD_COST_COLUMNS}
+        dtypes.update({col: "category" for col in CATEGORY_COLUMNS})
+        # All columns are kept: the dataset info panel and the exact-duplicate check use them
+        df = pd.read_csv("international_education_costs.csv", dtype=dtypes)
+        # Precompute totals once so reruns don't redo the column sum
+        if all(col in df.columns for col in USD_COST_COLUMNS):
+            usd = np.ascontiguousarray(df[USD_COST_COLUMNS].to_numpy(dtype=np.float64))
+            df['Total_Cost_USD'] = np.add.reduce(usd, axis=1)
         return df
     except FileNotFoundError:
         return None
@@ -70,9 +98,15 @@ def clean_data(df):
     """Clean the dataset while preserving all legitimate program entries"""
     # Clean whitespace from string columns
     string_columns = df.select_dtypes(include=['object']).columns
-    for col in string_columns:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
+    df[string_columns] = df[string_columns].apply(lambda s: s.str.strip())
+    
+    # Categorical columns only need their categories stripped
+    for col in df.select_dtypes(include=['category']).columns:
+        stripped = df[col].cat.categories.str.strip()
+        if stripped.is_unique:
+            df[col] = df[col].cat.rename_categories(stripped)
+        else:
+            df[col] = df[col].astype(object).str.strip().astype("category")
     
     # Only remove completely identical rows (all columns identical)
     before_cleaning = len(df)
@@ -83,9 +117,8 @@ def clean_data(df):
         st.sidebar.info(f"ℹ️ Removed {before_cleaning - after_cleaning} completely duplicate rows")
     
     # Check for potential level/degree column variations
-    potential_level_cols = ['Level', 'Degree', 'Degree_Level', 'Program_Level', 'Study_Level']
     level_col = None
-    for col in potential_level_cols:
+    for col in LEVEL_COLUMNS:
         if col in df.columns:
             level_col = col
             break
@@ -96,12 +129,17 @@ def clean_data(df):
         st.sidebar.warning("⚠️ No degree level column found. Looking for patterns in Program names...")
         # Try to extract level from program names
         if 'Program' in df.columns:
-            df['Level'] = df['Program'].str.extract(r'(Bachelor|Master|PhD|Doctorate|Graduate|Undergraduate)', case=False)
-            if df['Level'].notna().any():
+            # Run the regex once per distinct program, then map back by category code
+            programs = df['Program'].astype('category')
+            levels = programs.cat.categories.to_series().str.extract(LEVEL_PATTERN, expand=False).to_numpy(dtype=object)
+            if pd.notna(levels).any():
                 st.sidebar.info("ℹ️ Extracted degree levels from Program names")
             else:
-                df['Level'] = 'Not Specified'
                 st.sidebar.info("ℹ️ Created default Level column")
+            # Code -1 (missing program) picks the trailing NaN
+            level_values = np.append(levels, np.nan)[programs.cat.codes.to_numpy()]
+            # assign() returns a new frame; df may be the drop_duplicates() result
+            df = df.assign(Level=pd.Series(level_values, index=df.index).fillna('Not Specified'))
     
     return df
 
@@ -143,19 +181,28 @@ with st.expander("📋 Dataset Information", expanded=False):
     st.write("**Sample Data:**")
     st.dataframe(df.head(3))
 
+@st.cache_resource
+def get_http_session():
+    """Shared HTTP session that keeps connections alive and backs off on 429/5xx"""
+    session = requests.Session()
+    # Only 429/5xx responses are retried; an unreachable API fails after one timeout
+    retries = Retry(total=3, connect=0, read=0, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(max_retries=retries))
+    return session
+
 # Exchange rate with fallback
 @st.cache_data(ttl=3600)
 def fetch_exchange_rate():
     """Fetch USD to INR exchange rate with fallback"""
     try:
-        response = requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
+        response = get_http_session().get("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
         if response.status_code == 200:
             data = response.json()
             if 'rates' in data and 'INR' in data['rates']:
                 rate = data['rates']['INR']
                 st.sidebar.success(f"✅ Live exchange rate: 1 USD = {rate:.2f} INR")
                 return rate
-    except:
+    except requests.RequestException:
         pass
     
     # Fallback rate
@@ -165,22 +212,54 @@ def fetch_exchange_rate():
 
 exchange_rate = fetch_exchange_rate()
 
+@st.cache_data(show_spinner=False)
+def add_inr(df, rate):
+    """Return a copy of the dataset with INR cost columns, cached per exchange rate"""
+    usd_cols = USD_COST_COLUMNS + ['Total_Cost_USD']
+    inr_cols = [col.replace("USD", "INR") for col in usd_cols]
+    # float64 so converted rupee amounts round the same as before the float32 inputs
+    inr_data = pd.DataFrame(df[usd_cols].to_numpy(dtype=np.float64) * rate, columns=inr_cols, index=df.index)
+    return pd.concat([df, inr_data], axis=1)
+
 # Calculate INR values
-for col in ["Tuition_USD", "Rent_USD", "Visa_Fee_USD", "Insurance_USD"]:
-    if col in df.columns:
-        inr_col = col.replace("USD", "INR")
-        df[inr_col] = df[col] * exchange_rate
+df = add_inr(df, exchange_rate)
 
-# Calculate total costs
-df['Total_Cost_USD'] = df['Tuition_USD'] + df['Rent_USD'] + df['Visa_Fee_USD'] + df['Insurance_USD']
-df['Total_Cost_INR'] = df['Total_Cost_USD'] * exchange_rate
+@st.cache_data(show_spinner=False)
+def build_filter_index(df):
+    """Precompute sorted option lists for the sidebar and comparison filters"""
+    # Blank text cells stay NaN after cleaning, so keep them out of the options
+    countries = sorted(df["Country"].dropna().unique())
+    unis_by_country = {
+        country: sorted(df.loc[df["Country"] == country, "University"].dropna().unique())
+        for country in countries
+    }
+    # Keyed by (country, university) to match build_indices; names repeat across countries
+    if "Program" in df.columns:
+        progs_by_uni = (
+            df.dropna(subset=["Program"])
+            .groupby(["Country", "University"], observed=True)["Program"]
+            .unique()
+            .apply(sorted)
+            .to_dict()
+        )
+    else:
+        progs_by_uni = {}
+    all_unis = sorted(df["University"].dropna().unique())
+    return countries, unis_by_country, progs_by_uni, all_unis
+
+@st.cache_data(show_spinner=False)
+def build_indices(df):
+    """Map each (country, university) pair to its row positions"""
+    return df.groupby(['Country', 'University'], observed=True).indices
+
+countries, unis_by_country, progs_by_uni, all_universities = build_filter_index(df)
+row_indices = build_indices(df)
 
 # ENHANCED SIDEBAR FILTERS
 st.sidebar.header("🎓 Filter Options")
 st.sidebar.markdown("Select your preferences to customize the dashboard:")
 
 # Country Filter
-countries = sorted(df["Country"].unique())
 selected_country = st.sidebar.selectbox(
     "🌍 Select Country", 
     countries,
@@ -188,7 +267,7 @@ selected_country = st.sidebar.selectbox(
 )
 
 # University Filter
-colleges = sorted(df[df["Country"] == selected_country]["University"].unique())
+colleges = unis_by_country[selected_country]
 selected_college = st.sidebar.selectbox(
     "🏛️ Select University", 
     colleges,
@@ -196,11 +275,10 @@ selected_college = st.sidebar.selectbox(
 )
 
 # Program Filter 
-programs_filter_data = df[df["University"] == selected_college]
+programs_filter_data = df.iloc[row_indices.get((selected_country, selected_college), [])]
 if "Program" in df.columns and not programs_filter_data.empty:
-    programs_available = programs_filter_data["Program"].unique()
-    if len(programs_available) > 0:
-        programs = sorted(programs_available)
+    programs = progs_by_uni.get((selected_country, selected_college), [])
+    if len(programs) > 0:
         selected_program = st.sidebar.selectbox(
             "📚 Select Program", 
             programs,
@@ -233,7 +311,7 @@ else:
     selected_level = None
 
 # Final filtered data
-df_filtered = programs_filter_data.copy()
+df_filtered = programs_filter_data
 
 # Check if filtered data exists
 if df_filtered.empty:
@@ -255,345 +333,438 @@ st.sidebar.info(f"💱 Current Exchange Rate: 1 USD = {exchange_rate:.2f} INR")
 st.markdown("---")
 
 # Key Metrics Section
-st.subheader("🎯 Key Financial Metrics")
-col1, col2, col3, col4 = st.columns(4)
+@st.fragment
+def key_metrics_section(selected_row):
+    """Render the key metrics for the selected program entry"""
+    st.subheader("🎯 Key Financial Metrics")
+    col1, col2, col3, col4 = st.columns(4)
 
-with col1:
-    if "Living_Cost_Index" in selected_row and pd.notna(selected_row['Living_Cost_Index']):
+    with col1:
+        if "Living_Cost_Index" in selected_row and pd.notna(selected_row['Living_Cost_Index']):
+            st.metric(
+                "Living Cost Index", 
+                f"{selected_row['Living_Cost_Index']:.1f}",
+                help="Cost of living index compared to global average"
+            )
+        else:
+            st.metric("Living Cost Index", "N/A")
+
+    with col2:
         st.metric(
-            "Living Cost Index", 
-            f"{selected_row['Living_Cost_Index']:.1f}",
-            help="Cost of living index compared to global average"
+            "Tuition (USD)", 
+            f"${selected_row['Tuition_USD']:,.2f}",
+            help="Annual tuition fee in US Dollars"
         )
-    else:
-        st.metric("Living Cost Index", "N/A")
 
-with col2:
-    st.metric(
-        "Tuition (USD)", 
-        f"${selected_row['Tuition_USD']:,.2f}",
-        help="Annual tuition fee in US Dollars"
-    )
-
-with col3:
-    st.metric(
-        "Tuition (INR)", 
-        f"₹{selected_row['Tuition_INR']:,.0f}",
-        help="Annual tuition fee in Indian Rupees"
-    )
-
-with col4:
-    st.metric(
-        "Total Cost (USD)", 
-        f"${selected_row['Total_Cost_USD']:,.2f}",
-        help="Total annual cost including all components"
-    )
+    with col3:
+        st.metric(
+            "Tuition (INR)", 
+            f"₹{selected_row['Tuition_INR']:,.0f}",
+            help="Annual tuition fee in Indian Rupees"
+        )
 
-# Cost Breakdown Section
-st.subheader("💰 Cost Breakdown Analysis")
+    with col4:
+        st.metric(
+            "Total Cost (USD)", 
+            f"${selected_row['Total_Cost_USD']:,.2f}",
+            help="Total annual cost including all components"
+        )
 
-col1, col2 = st.columns([1, 1])
+key_metrics_section(selected_row)
 
-with col1:
-    # Pie Chart
-    breakdown = {
-        "Tuition": selected_row["Tuition_INR"],
-        "Rent": selected_row["Rent_INR"],
-        "Visa Fee": selected_row["Visa_Fee_INR"],
-        "Insurance": selected_row["Insurance_INR"]
-    }
-    
-    # Filter out zero values
-    breakdown = {k: v for k, v in breakdown.items() if v > 0}
-    
+# Cached figure builders; items are hashable (label, value) tuples.
+# cache_resource is process-wide, so entries are bounded and expire with the exchange rate.
+@st.cache_resource(show_spinner=False, max_entries=64, ttl=3600)
+def build_pie(title, items):
+    """Build the cost distribution pie chart"""
     fig_pie = px.pie(
-        names=list(breakdown.keys()),
-        values=list(breakdown.values()),
-        title=f"Cost Distribution for {selected_college}",
-        color_discrete_sequence=px.colors.qualitative.Set3
+        names=[label for label, _ in items],
+        values=[value for _, value in items],
+        title=title,
+        color_discrete_sequence=PIE_COLORS
     )
     fig_pie.update_traces(
         textposition='inside', 
         textinfo='percent+label',
         hovertemplate='<b>%{label}</b><br>Percentage: %{percent}<br>Amount: ₹%{value:,.0f}<extra></extra>'
     )
-    st.plotly_chart(fig_pie, use_container_width=True)
+    return fig_pie
 
-with col2:
-    # Bar chart
+@st.cache_resource(show_spinner=False, max_entries=64, ttl=3600)
+def build_breakdown_bar(title, items):
+    """Build the cost components bar chart"""
     stack_data = pd.DataFrame({
-        "Component": list(breakdown.keys()),
-        "Cost (INR)": list(breakdown.values())
+        "Component": [label for label, _ in items],
+        "Cost (INR)": [value for _, value in items]
     })
     
     fig_bar = px.bar(
         stack_data,
         x="Component",
         y="Cost (INR)",
-        title=f"Cost Components - {selected_college}",
+        title=title,
         color="Component",
         text="Cost (INR)",
-        color_discrete_sequence=px.colors.sequential.Blues_r
+        color_discrete_sequence=BAR_COLORS
     )
     fig_bar.update_traces(texttemplate='₹%{text:,.0f}', textposition='outside')
     fig_bar.update_layout(showlegend=False)
+    return fig_bar
+
+# Cost Breakdown Section
+st.subheader("💰 Cost Breakdown Analysis")
+
+col1, col2 = st.columns([1, 1])
+
+breakdown = {
+    "Tuition": selected_row["Tuition_INR"],
+    "Rent": selected_row["Rent_INR"],
+    "Visa Fee": selected_row["Visa_Fee_INR"],
+    "Insurance": selected_row["Insurance_INR"]
+}
+
+# Filter out zero values
+breakdown_items = tuple((k, float(v)) for k, v in breakdown.items() if v > 0)
+
+with col1:
+    # Pie Chart
+    fig_pie = build_pie(f"Cost Distribution for {selected_college}", breakdown_items)
+    st.plotly_chart(fig_pie, use_container_width=True)
+
+with col2:
+    # Bar chart
+    fig_bar = build_breakdown_bar(f"Cost Components - {selected_college}", breakdown_items)
     st.plotly_chart(fig_bar, use_container_width=True)
 
+@st.cache_resource(show_spinner=False, max_entries=64, ttl=3600)
+def build_comparison_chart(chart_data, chart_type):
+    """Build the university comparison bar chart for the given chart type"""
+    required_inr_cols = ["Tuition_INR", "Rent_INR", "Visa_Fee_INR", "Insurance_INR"]
+    available_inr_cols = [col for col in required_inr_cols if col in chart_data.columns]
+    
+    if chart_type == "Total Cost Only":
+        # Simple total cost comparison
+        fig_comparison = px.bar(
+            chart_data,
+            x="University",
+            y="Total_Cost_INR" if "Total_Cost_INR" in chart_data.columns else chart_data[available_inr_cols].sum(axis=1),
+            title="Total University Cost Comparison",
+            color="University",
+            height=500,
+            color_discrete_sequence=CMP_COLORS
+        )
+        fig_comparison.update_layout(showlegend=False)
+    else:
+        # Component breakdown in long form, built directly from the value matrix
+        amounts = chart_data[available_inr_cols].to_numpy()
+        component_names = [col.replace("_INR", "").replace("_", " ").title() for col in available_inr_cols]
+        df_melted = pd.DataFrame({
+            "University": np.repeat(chart_data["University"].to_numpy(), amounts.shape[1]),
+            "Cost Component": np.tile(component_names, amounts.shape[0]),
+            "Amount (INR)": amounts.ravel()
+        })
+        
+        barmode = "stack" if chart_type == "Stacked Bar" else "group"
+        
+        fig_comparison = px.bar(
+            df_melted,
+            x="University",
+            y="Amount (INR)",
+            color="Cost Component",
+            title=f"University Cost Comparison - {chart_type}",
+            barmode=barmode,
+            height=500,
+            color_discrete_sequence=CMP_COLORS
+        )
+    
+    fig_comparison.update_layout(
+        xaxis_tickangle=-45,
+        xaxis_title="University",
+        yaxis_title="Cost (INR)",
+        legend_title="Cost Components"
+    )
+    return fig_comparison
+
+@st.cache_data(show_spinner=False)
+def university_codes(df):
+    """Return the University category codes and a name-to-code lookup"""
+    codes = df["University"].cat.codes.to_numpy()
+    cat_to_code = {uni: code for code, uni in enumerate(df["University"].cat.categories)}
+    return codes, cat_to_code
+
+@st.cache_data(show_spinner=False)
+def per_uni_means(df):
+    """Average costs and program counts per university over the full dataset"""
+    cost_cols = USD_COST_COLUMNS + ['Total_Cost_USD']
+    cost_cols += [col.replace('USD', 'INR') for col in cost_cols]
+    agg_funcs = {col: (col, 'mean') for col in cost_cols if col in df.columns}
+    return df.groupby(['University', 'Country'], as_index=False, observed=True, dropna=False).agg(
+        **agg_funcs,
+        Total_Programs=('University', 'size')
+    )
+
 # ENHANCED UNIVERSITY COMPARISON SECTION
-st.subheader("🏛️ Enhanced University Comparison")
-
-# University selector for comparison
-all_universities = sorted(df["University"].unique())
-comparison_unis = st.multiselect(
-    "🔍 Select Universities for Comparison (2-3 recommended)",
-    options=all_universities,
-    default=[selected_college] if selected_college in all_universities else [all_universities[0]],
-    help="Select multiple universities to compare their costs and programs"
-)
+@st.fragment
+def comparison_section(df, selected_college, all_universities):
+    """Render the comparison table and chart; reruns on its own widgets only"""
+    st.subheader("🏛️ Enhanced University Comparison")
+
+    # University selector for comparison
+    comparison_unis = st.multiselect(
+        "🔍 Select Universities for Comparison (2-3 recommended)",
+        options=all_universities,
+        default=[selected_college] if selected_college in all_universities else [all_universities[0]],
+        help="Select multiple universities to compare their costs and programs"
+    )
 
-if comparison_unis:
-    # Get data for selected universities
-    comparison_data = df[df["University"].isin(comparison_unis)].copy()
+    if comparison_unis:
+        # Get data for selected universities
+        # Membership test on integer category codes instead of strings
+        uni_codes, cat_to_code = university_codes(df)
+        selected_codes = np.fromiter((cat_to_code[uni] for uni in comparison_unis), dtype=np.int32)
+        comparison_data = df.iloc[np.flatnonzero(np.isin(uni_codes, selected_codes))]
+        
+        # Per-university averages come from one cached aggregation
+        uni_means = per_uni_means(df)
+        selected_means = uni_means[uni_means['University'].isin(comparison_unis)]
     
-    if not comparison_data.empty:
-        # Enhanced comparison options
-        st.markdown("### 📊 Comparison Options")
-        col1, col2 = st.columns(2)
+        if not comparison_data.empty:
+            # Enhanced comparison options
+            st.markdown("### 📊 Comparison Options")
+            col1, col2 = st.columns(2)
         
-        with col1:
-            comparison_mode = st.radio(
-                "Choose Comparison View:",
-                options=["University Overview", "All Programs & Levels", "Program Comparison"],
-                help="University Overview: One entry per university | All Programs: Every program entry | Program Comparison: Same program across universities"
-            )
+            with col1:
+                comparison_mode = st.radio(
+                    "Choose Comparison View:",
+                    options=["University Overview", "All Programs & Levels", "Program Comparison"],
+                    help="University Overview: One entry per university | All Programs: Every program entry | Program Comparison: Same program across universities"
+                )
         
-        with col2:
-            show_inr = st.checkbox("Show INR columns", value=True, help="Toggle INR currency columns")
+            with col2:
+                show_inr = st.checkbox("Show INR columns", value=True, help="Toggle INR currency columns")
         
-        # Process data based on comparison mode
-        if comparison_mode == "University Overview":
-            # Show aggregated data per university
-            agg_funcs = {col: 'mean' for col in ['Tuition_USD', 'Rent_USD', 'Visa_Fee_USD', 'Insurance_USD', 'Total_Cost_USD'] if col in comparison_data.columns}
-            display_data = comparison_data.groupby(['University', 'Country'], as_index=False).agg(agg_funcs)
-            
-            # Add program count
-            program_counts = comparison_data.groupby('University').size()
-            display_data['Total_Programs'] = display_data['University'].map(program_counts)
-            
-            # Add INR columns
-            if show_inr:
-                for col in ['Tuition_USD', 'Rent_USD', 'Visa_Fee_USD', 'Insurance_USD', 'Total_Cost_USD']:
-                    if col in display_data.columns:
-                        inr_col = col.replace('USD', 'INR')
-                        display_data[inr_col] = display_data[col] * exchange_rate
+            # Process data based on comparison mode
+            if comparison_mode == "University Overview":
+                # Show aggregated data per university
+                display_data = selected_means
             
-            st.info("📋 Showing averaged costs across all programs for each university")
+                st.info("📋 Showing averaged costs across all programs for each university")
             
-        elif comparison_mode == "All Programs & Levels":
-            # Show all entries with enhanced columns
-            display_data = comparison_data.copy()
-            st.info(f"📋 Showing all {len(display_data)} program entries")
+            elif comparison_mode == "All Programs & Levels":
+                # Show all entries with enhanced columns
+                display_data = comparison_data
+                if len(display_data) > MAX_TABLE_ROWS:
+                    st.info(f"📋 Showing the first {MAX_TABLE_ROWS} of {len(display_data)} program entries. Narrow the selection to see the rest.")
+                else:
+                    st.info(f"📋 Showing all {len(display_data)} program entries")
             
-        else:  # Program Comparison
-            # Filter by program if available
-            if 'Program' in comparison_data.columns:
-                available_programs = comparison_data['Program'].unique()
-                if len(available_programs) > 1:
-                    compare_program = st.selectbox(
-                        "📚 Select Program to Compare Across Universities:",
-                        sorted(available_programs),
-                        help="Choose a program that exists in multiple universities"
-                    )
-                    display_data = comparison_data[comparison_data['Program'] == compare_program].copy()
-                    if display_data.empty:
-                        st.warning(f"No data found for program: {compare_program}")
-                        display_data = comparison_data.copy()
+            else:  # Program Comparison
+                # Filter by program if available
+                if 'Program' in comparison_data.columns:
+                    # Blank Program cells are NaN and can't be sorted or selected
+                    available_programs = comparison_data['Program'].dropna().unique()
+                    if len(available_programs) > 1:
+                        compare_program = st.selectbox(
+                            "📚 Select Program to Compare Across Universities:",
+                            sorted(available_programs),
+                            help="Choose a program that exists in multiple universities"
+                        )
+                        display_data = comparison_data[comparison_data['Program'] == compare_program]
+                        if display_data.empty:
+                            st.warning(f"No data found for program: {compare_program}")
+                            display_data = comparison_data
+                    else:
+                        display_data = comparison_data
                 else:
-                    display_data = comparison_data.copy()
-            else:
-                display_data = comparison_data.copy()
+                    display_data = comparison_data
         
-        # Define display columns based on available data
-        base_columns = ["University", "Country"]
+            # Define display columns based on available data
+            base_columns = ["University", "Country"]
         
-        # Add Program and Level columns if available
-        if 'Program' in display_data.columns and comparison_mode != "University Overview":
-            base_columns.append("Program")
-        if 'Level' in display_data.columns and comparison_mode != "University Overview":
-            base_columns.append("Level")
+            # Add Program and Level columns if available
+            if 'Program' in display_data.columns and comparison_mode != "University Overview":
+                base_columns.append("Program")
+            if 'Level' in display_data.columns and comparison_mode != "University Overview":
+                base_columns.append("Level")
         
-        # Add cost columns
-        cost_columns_usd = ["Tuition_USD", "Rent_USD", "Visa_Fee_USD", "Insurance_USD", "Total_Cost_USD"]
-        cost_columns_inr = ["Tuition_INR", "Rent_INR", "Visa_Fee_INR", "Insurance_INR", "Total_Cost_INR"]
+            # Add cost columns
+            cost_columns_usd = ["Tuition_USD", "Rent_USD", "Visa_Fee_USD", "Insurance_USD", "Total_Cost_USD"]
+            cost_columns_inr = ["Tuition_INR", "Rent_INR", "Visa_Fee_INR", "Insurance_INR", "Total_Cost_INR"]
         
-        if show_inr:
-            display_columns = base_columns + cost_columns_usd + cost_columns_inr
-        else:
-            display_columns = base_columns + cost_columns_usd
+            if show_inr:
+                display_columns = base_columns + cost_columns_usd + cost_columns_inr
+            else:
+                display_columns = base_columns + cost_columns_usd
         
-        # Add Total_Programs for overview mode
-        if comparison_mode == "University Overview" and 'Total_Programs' in display_data.columns:
-            display_columns.insert(-len(cost_columns_usd) - (len(cost_columns_inr) if show_inr else 0), 'Total_Programs')
+            # Add Total_Programs for overview mode
+            if comparison_mode == "University Overview" and 'Total_Programs' in display_data.columns:
+                display_columns.insert(-len(cost_columns_usd) - (len(cost_columns_inr) if show_inr else 0), 'Total_Programs')
         
-        # Filter to existing columns
-        display_columns = [col for col in display_columns if col in display_data.columns]
+            # Filter to existing columns
+            display_columns = [col for col in display_columns if col in display_data.columns]
         
-        # Sort the data
-        if 'Program' in display_data.columns and 'Level' in display_data.columns:
-            display_data = display_data.sort_values(['University', 'Program', 'Level'])
-        elif 'Program' in display_data.columns:
-            display_data = display_data.sort_values(['University', 'Program'])
-        else:
-            display_data = display_data.sort_values(['University'])
+            # Sort the data
+            if 'Program' in display_data.columns and 'Level' in display_data.columns:
+                display_data = display_data.sort_values(['University', 'Program', 'Level'])
+            elif 'Program' in display_data.columns:
+                display_data = display_data.sort_values(['University', 'Program'])
+            else:
+                display_data = display_data.sort_values(['University'])
         
-        # ENHANCED DATA TABLE
-        st.subheader(f"📊 {comparison_mode} - Enhanced Data Table")
+            # ENHANCED DATA TABLE
+            st.subheader(f"📊 {comparison_mode} - Enhanced Data Table")
         
-        # Create enhanced column config
-        column_config = {
-            "University": st.column_config.TextColumn("🏛️ University", width="large"),
-            "Country": st.column_config.TextColumn("🌍 Country", width="small"),
-            "Program": st.column_config.TextColumn("📚 Program", width="medium"),
-            "Level": st.column_config.TextColumn("🎓 Level", width="small"),
-            "Total_Programs": st.column_config.NumberColumn("📊 Total Programs", format="%d"),
-            "Tuition_USD": st.column_config.NumberColumn("💰 Tuition (USD)", format="$%,.0f"),
-            "Rent_USD": st.column_config.NumberColumn("🏠 Rent (USD)", format="$%,.0f"),
-            "Visa_Fee_USD": st.column_config.NumberColumn("📄 Visa (USD)", format="$%,.0f"),
-            "Insurance_USD": st.column_config.NumberColumn("🏥 Insurance (USD)", format="$%,.0f"),
-            "Total_Cost_USD": st.column_config.NumberColumn("💵 Total (USD)", format="$%,.0f"),
-            "Tuition_INR": st.column_config.NumberColumn("💰 Tuition (INR)", format="₹%,.0f"),
-            "Rent_INR": st.column_config.NumberColumn("🏠 Rent (INR)", format="₹%,.0f"),
-            "Visa_Fee_INR": st.column_config.NumberColumn("📄 Visa (INR)", format="₹%,.0f"),
-            "Insurance_INR": st.column_config.NumberColumn("🏥 Insurance (INR)", format="₹%,.0f"),
-            "Total_Cost_INR": st.column_config.NumberColumn("💵 Total (INR)", format="₹%,.0f"),
-        }
+            # Create enhanced column config
+            column_config = {
+                "University": st.column_config.TextColumn("🏛️ University", width="large"),
+                "Country": st.column_config.TextColumn("🌍 Country", width="small"),
+                "Program": st.column_config.TextColumn("📚 Program", width="medium"),
+                "Level": st.column_config.TextColumn("🎓 Level", width="small"),
+                "Total_Programs": st.column_config.NumberColumn("📊 Total Programs", format="%d"),
+                "Tuition_USD": st.column_config.NumberColumn("💰 Tuition (USD)", format="$%,.0f"),
+                "Rent_USD": st.column_config.NumberColumn("🏠 Rent (USD)", format="$%,.0f"),
+                "Visa_Fee_USD": st.column_config.NumberColumn("📄 Visa (USD)", format="$%,.0f"),
+                "Insurance_USD": st.column_config.NumberColumn("🏥 Insurance (USD)", format="$%,.0f"),
+                "Total_Cost_USD": st.column_config.NumberColumn("💵 Total (USD)", format="$%,.0f"),
+                "Tuition_INR": st.column_config.NumberColumn("💰 Tuition (INR)", format="₹%,.0f"),
+                "Rent_INR": st.column_config.NumberColumn("🏠 Rent (INR)", format="₹%,.0f"),
+                "Visa_Fee_INR": st.column_config.NumberColumn("📄 Visa (INR)", format="₹%,.0f"),
+                "Insurance_INR": st.column_config.NumberColumn("🏥 Insurance (INR)", format="₹%,.0f"),
+                "Total_Cost_INR": st.column_config.NumberColumn("💵 Total (INR)", format="₹%,.0f"),
+            }
         
-        # Display the enhanced table
-        st.dataframe(
-            display_data[display_columns], 
-            use_container_width=True,
-            hide_index=True,
-            column_config=column_config,
-            height=400
-        )
+            # Send only the shown columns and a bounded number of rows;
+            # categoricals stay categorical so Arrow dictionary-encodes them
+            display_view = display_data[display_columns].reset_index(drop=True)
+            if len(display_view) > MAX_TABLE_ROWS:
+                # All Programs & Levels already reports the cap in its info message
+                if comparison_mode != "All Programs & Levels":
+                    st.caption(f"Showing the first {MAX_TABLE_ROWS} of {len(display_view)} entries. Narrow the selection to see the rest.")
+                display_view = display_view.head(MAX_TABLE_ROWS)
+            
+            # Display the enhanced table
+            st.dataframe(
+                display_view, 
+                use_container_width=True,
+                hide_index=True,
+                column_config=column_config,
+                height=400
+            )
         
-        # Enhanced summary information
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("📊 Total Entries", len(display_data))
-        with col2:
-            st.metric("🏛️ Universities", len(display_data['University'].unique()))
-        with col3:
-            if 'Program' in display_data.columns:
-                st.metric("📚 Programs", len(display_data['Program'].unique()))
-            else:
-                st.metric("Programs", "N/A")
-        with col4:
-            if 'Level' in display_data.columns:
-                st.metric("🎓 Levels", len(display_data['Level'].unique()))
-            else:
-                st.metric("Levels", "N/A")
+            # Enhanced summary information
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("📊 Total Entries", len(display_data))
+            with col2:
+                st.metric("🏛️ Universities", len(display_data['University'].unique()))
+            with col3:
+                if 'Program' in display_data.columns:
+                    st.metric("📚 Programs", len(display_data['Program'].unique()))
+                else:
+                    st.metric("Programs", "N/A")
+            with col4:
+                if 'Level' in display_data.columns:
+                    st.metric("🎓 Levels", len(display_data['Level'].unique()))
+                else:
+                    st.metric("Levels", "N/A")
         
-        # ENHANCED VISUALIZATION
-        st.subheader("📊 University Cost Comparison Chart")
+            # ENHANCED VISUALIZATION
+            st.subheader("📊 University Cost Comparison Chart")
         
-        # Create chart data (always aggregated for clean visualization)
-        chart_data = comparison_data.groupby(['University', 'Country'], as_index=False).agg({
-            col: 'mean' for col in ['Tuition_INR', 'Rent_INR', 'Visa_Fee_INR', 'Insurance_INR'] 
-            if col in comparison_data.columns
-        }).round(0)
+            # Create chart data (always aggregated for clean visualization)
+            chart_columns = ['University', 'Country'] + [
+                col for col in ['Tuition_INR', 'Rent_INR', 'Visa_Fee_INR', 'Insurance_INR']
+                if col in selected_means.columns
+            ]
+            chart_data = selected_means[chart_columns].round(0)
         
-        # Chart options
-        chart_type = st.radio(
-            "Chart Type:",
-            options=["Stacked Bar", "Grouped Bar", "Total Cost Only"],
-            horizontal=True
-        )
+            # Chart options
+            chart_type = st.radio(
+                "Chart Type:",
+                options=["Stacked Bar", "Grouped Bar", "Total Cost Only"],
+                horizontal=True
+            )
         
-        required_inr_cols = ["Tuition_INR", "Rent_INR", "Visa_Fee_INR", "Insurance_INR"]
-        available_inr_cols = [col for col in required_inr_cols if col in chart_data.columns]
+            required_inr_cols = ["Tuition_INR", "Rent_INR", "Visa_Fee_INR", "Insurance_INR"]
+            available_inr_cols = [col for col in required_inr_cols if col in chart_data.columns]
         
-        if available_inr_cols:
-            if chart_type == "Total Cost Only":
-                # Simple total cost comparison
-                fig_comparison = px.bar(
-                    chart_data,
-                    x="University",
-                    y="Total_Cost_INR" if "Total_Cost_INR" in chart_data.columns else chart_data[available_inr_cols].sum(axis=1),
-                    title="Total University Cost Comparison",
-                    color="University",
-                    height=500,
-                    color_discrete_sequence=px.colors.qualitative.Set2
-                )
-                fig_comparison.update_layout(showlegend=False)
+            if available_inr_cols:
+                fig_comparison = build_comparison_chart(chart_data, chart_type)
+                st.plotly_chart(fig_comparison, use_container_width=True)
             else:
-                # Component breakdown
-                df_melted = chart_data.melt(
-                    id_vars=["University", "Country"], 
-                    value_vars=available_inr_cols, 
-                    var_name="Cost Component", 
-                    value_name="Amount (INR)"
-                )
-                
-                df_melted["Cost Component"] = df_melted["Cost Component"].str.replace("_INR", "").str.replace("_", " ").str.title()
-                
-                barmode = "stack" if chart_type == "Stacked Bar" else "group"
-                
-                fig_comparison = px.bar(
-                    df_melted,
-                    x="University",
-                    y="Amount (INR)",
-                    color="Cost Component",
-                    title=f"University Cost Comparison - {chart_type}",
-                    barmode=barmode,
-                    height=500,
-                    color_discrete_sequence=px.colors.qualitative.Set2
-                )
-            
-            fig_comparison.update_layout(
-                xaxis_tickangle=-45,
-                xaxis_title="University",
-                yaxis_title="Cost (INR)",
-                legend_title="Cost Components"
-            )
-            st.plotly_chart(fig_comparison, use_container_width=True)
-        else:
-            st.warning("No cost data available for chart visualization.")
+                st.warning("No cost data available for chart visualization.")
     
+        else:
+            st.error("No data available for selected universities.")
     else:
-        st.error("No data available for selected universities.")
-else:
-    st.info("Select universities above to see detailed comparison.")
+        st.info("Select universities above to see detailed comparison.")
 
-# Additional Analytics
+comparison_section(df, selected_college, all_universities)
+
+@st.cache_data(show_spinner=False)
+def top_rankings(df):
+    """Rank the most expensive universities and countries by total USD cost"""
+    top_expensive = (
+        df.groupby(['University', 'Country'], observed=True, dropna=False)['Total_Cost_USD']
+        .max()
+        .nlargest(5)
+        .reset_index()
+    )
+    country_avg = df.groupby('Country', observed=True, dropna=False)['Total_Cost_USD'].mean().nlargest(5)
+    return top_expensive, country_avg
+
+# Additional Analytics (one markdown write per list; "$" escaped so it isn't read as LaTeX)
 st.subheader("📈 Additional Insights")
 
+top_expensive, country_avg = top_rankings(df)
+
 col1, col2 = st.columns(2)
 
 with col1:
     # Top 5 most expensive universities
     if len(df) >= 5:
-        df_unique = df.groupby(['University', 'Country'])['Total_Cost_USD'].max().reset_index()
-        top_expensive = df_unique.nlargest(5, 'Total_Cost_USD')
-        
-        st.write("**Top 5 Most Expensive Universities:**")
-        for idx, row in top_expensive.iterrows():
-            st.write(f"• {row['University']} ({row['Country']}) - ${row['Total_Cost_USD']:,.0f}")
+        lines = "  \n".join(
+            f"• {uni} ({country}) - \\${cost:,.0f}"
+            for uni, country, cost in zip(
+                top_expensive['University'].to_numpy(),
+                top_expensive['Country'].to_numpy(),
+                top_expensive['Total_Cost_USD'].to_numpy()
+            )
+        )
+        st.markdown("**Top 5 Most Expensive Universities:**\n\n" + lines)
 
 with col2:
     # Country-wise average costs
-    if len(df['Country'].unique()) > 1:
-        country_avg = df.groupby('Country')['Total_Cost_USD'].mean().sort_values(ascending=False)
-        st.write("**Average Cost by Country:**")
-        for country, cost in country_avg.head(5).items():
-            st.write(f"• {country}: ${cost:,.0f}")
+    if len(country_avg) > 1:
+        lines = "  \n".join(
+            f"• {country}: \\${cost:,.0f}"
+            for country, cost in zip(country_avg.index, country_avg.to_numpy())
+        )
+        st.markdown("**Average Cost by Country:**\n\n" + lines)
+
+@st.cache_data(show_spinner=False)
+def quality_report(df):
+    """Count missing values and potential duplicate entries"""
+    missing_data = df.isnull().sum()
+    
+    # Check for duplicate entries
+    if 'Program' in df.columns and 'Level' in df.columns:
+        duplicate_key = ['University', 'Program', 'Level']
+    elif 'Program' in df.columns:
+        duplicate_key = ['University', 'Program']
+    else:
+        duplicate_key = ['University']
+    
+    duplicates = int(df.duplicated(subset=duplicate_key).sum())
+    return missing_data, duplicate_key, duplicates
 
 # Data Quality Report
 with st.expander("🔍 Data Quality Report", expanded=False):
     st.subheader("Data Completeness Analysis")
     
+    missing_data, duplicate_key, duplicates = quality_report(df)
+    
     # Check for missing values
-    missing_data = df.isnull().sum()
     if missing_data.sum() > 0:
         st.write("**Missing Values by Column:**")
         for col, missing_count in missing_data[missing_data > 0].items():
@@ -602,15 +773,6 @@ with st.expander("🔍 Data Quality Report", expanded=False):
     else:
         st.success("✅ No missing values found in the dataset!")
     
-    # Check for duplicate entries
-    if 'Program' in df.columns and 'Level' in df.columns:
-        duplicate_key = ['University', 'Program', 'Level']
-    elif 'Program' in df.columns:
-        duplicate_key = ['University', 'Program']
-    else:
-        duplicate_key = ['University']
-    
-    duplicates = df.duplicated(subset=duplicate_key).sum()
     if duplicates > 0:
         st.warning(f"⚠️ Found {duplicates} potential duplicate entries based on {', '.join(duplicate_key)}")
     else: